@@ -1,8 +1,11 @@
 import os
 import threading
+import queue
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import traceback
 from datetime import datetime
-from PIL import Image, ImageTk, ImageDraw
+from functools import lru_cache
+from PIL import Image, ImageTk
 import numpy as np
 import cv2
 import customtkinter as ctk
@@ -16,6 +19,16 @@ ctk.set_default_color_theme("blue")
 # Windowsの標準フォントを設定
 DEFAULT_FONT = ("Meiryo UI", 12, "bold")
 HEADING_FONT = ("Meiryo UI", 14, "bold")
+# スライダー操作時のプレビュー更新をまとめる待ち時間 (ミリ秒)
+PREVIEW_DEBOUNCE_MS = 60
+# ログ表示をまとめて更新する間隔 (ミリ秒)
+LOG_FLUSH_INTERVAL_MS = 100
+# 出力PNGの圧縮レベル (0-9)。低いほど高速でファイルサイズは大きくなる
+PNG_COMPRESSION_LEVEL = 1
+# バリエーション生成の最大スレッド数。各スレッドが画像サイズの作業バッファを持つため上限を設ける
+MAX_GENERATION_WORKERS = 8
+# RGBスライダーの段階数 (0.01刻み)。値が離散的になり、同じ値のLUTをキャッシュから再利用できる
+RGB_SLIDER_STEPS = 200
 
 def load_image(image_path):
     """
@@ -34,6 +47,88 @@ def load_image(image_path):
     except Exception as e:
         raise Exception(f"Failed to load image: {str(e)}")
 
+def has_alpha(image):
+    """
+    Check whether an image carries transparency information.
+    
+    Args:
+        image (PIL.Image): The image to check.
+    Returns:
+        bool: True if the image has an alpha channel or a transparent palette entry.
+    """
+    return image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info
+
+@lru_cache(maxsize=128)
+def build_rgb_lut(r_strength, g_strength, b_strength, mode, channels):
+    """
+    Build the cv2.LUT table for an RGB adjustment.
+    Each channel is a pure function of its uint8 value, so the adjustment is
+    precomputed for all 256 inputs. Tables are cached by their parameters, so
+    re-rendering at the same slider position skips the rebuild.
+    
+    Args:
+        r_strength (float): The strength of the red channel adjustment (0.0 to 2.0).
+        g_strength (float): The strength of the green channel adjustment (0.0 to 2.0).
+        b_strength (float): The strength of the blue channel adjustment (0.0 to 2.0).
+        mode (str): The adjustment mode: "additive" or "multiplicative" (lowercase).
+        channels (int): 3 for RGB, or 4 for RGBA with alpha mapped through identity.
+    Returns:
+        np.ndarray: A read-only (1, 256, channels) uint8 lookup table.
+    Raises:
+        ValueError: If the mode is not supported.
+    """
+    # Per-channel strengths broadcast against the 256 possible input values.
+    # The per-channel factor is computed in float64 and only then applied to the
+    # float32 pixel values, matching the original per-pixel arithmetic exactly.
+    strengths = np.array([r_strength, g_strength, b_strength])
+    input_values = np.arange(256, dtype=np.float32)[:, None]
+
+    if mode == "additive":
+        # MAX_ADJUSTMENT_FACTOR determines the scale of adjustment.
+        # (strength - 1.0) ranges from -1.0 to +1.0.
+        # Multiplying by 255.0 means adjustment can range from -255 to +255.
+        MAX_ADJUSTMENT_FACTOR = 255.0
+        adjusted_values = input_values + ((strengths - 1.0) * MAX_ADJUSTMENT_FACTOR).astype(np.float32)
+
+    elif mode == "multiplicative":
+        adjusted_values = input_values * strengths.astype(np.float32)
+    
+    else:
+        raise ValueError(f"Unsupported adjustment mode: {mode}. Choose 'additive' or 'multiplicative'.")
+    
+    lut = np.empty((1, 256, channels), dtype=np.uint8)
+    lut[0, :, :3] = np.clip(adjusted_values, 0, 255)
+    if channels == 4:
+        lut[0, :, 3] = np.arange(256)
+    lut.flags.writeable = False
+    return lut
+
+def adjust_array_rgb(image_np, r_strength=1.0, g_strength=1.0, b_strength=1.0, mode="additive"):
+    """
+    Adjust the R, G and B channels of a pixel array, leaving any alpha channel untouched.
+    
+    Args:
+        image_np (np.ndarray): The (H, W, 3) or (H, W, 4) uint8 pixels in RGB(A) order.
+        r_strength (float): The strength of the red channel adjustment (0.0 to 2.0).
+        g_strength (float): The strength of the green channel adjustment (0.0 to 2.0).
+        b_strength (float): The strength of the blue channel adjustment (0.0 to 2.0).
+        mode (str): The adjustment mode: "additive" or "multiplicative".
+    Returns:
+        np.ndarray: The adjusted array with the same shape as the input. When every
+            strength is 1.0 the table is the identity and image_np itself is returned.
+    Raises:
+        ValueError: If a strength is out of range or the mode is not supported.
+    """
+    # Validate input parameters
+    for channel, value in [("Red", r_strength), ("Green", g_strength), ("Blue", b_strength)]:
+        if not 0.0 <= value <= 2.0:
+            raise ValueError(f"{channel} strength must be between 0.0 and 2.0")
+    
+    lut = build_rgb_lut(r_strength, g_strength, b_strength, mode.lower(), image_np.shape[2])
+    if r_strength == g_strength == b_strength == 1.0:
+        return image_np  # Both modes leave every value unchanged at 1.0
+    return cv2.LUT(image_np, lut)
+
 def adjust_image_rgb(image, r_strength=1.0, g_strength=1.0, b_strength=1.0, mode="additive"):
     """B channels of an image using a specified method.
     Preserves transparency for images with alpha channel.
@@ -47,58 +142,145 @@ def adjust_image_rgb(image, r_strength=1.0, g_strength=1.0, b_strength=1.0, mode
         b_strength (float): The strength of the blue channel adjustment (0.0 to 2.0).
         mode (str): The adjustment mode: "additive" or "multiplicative".
     Returns:
-        PIL.Image: The adjusted image in RGBA format.
+        PIL.Image: The adjusted image in RGBA format, or RGB if the input has no transparency.
     """
     try:
-        # Validate input parameters
-        for channel, value in [("Red", r_strength), ("Green", g_strength), ("Blue", b_strength)]:
-            if not 0.0 <= value <= 2.0:
-                raise ValueError(f"{channel} strength must be between 0.0 and 2.0")
-        
-        # Ensure the image is in RGBA format for consistent processing
-        if image.mode != 'RGBA':
-            image = image.convert('RGBA')
-            
-        image_np = np.array(image)
-        
-        # Separate RGB and alpha channels.
-        # Convert RGB to float32 for calculations to prevent overflow/underflow and precision loss.
-        rgb_channels_np_float = image_np[:, :, :3].astype(np.float32)
-        alpha_channel_np = image_np[:, :, 3]  # Alpha channel remains uint8
-            
-        strengths = [r_strength, g_strength, b_strength]
-        
-        if mode.lower() == "additive":
-            # MAX_ADJUSTMENT_FACTOR determines the scale of adjustment.
-            # (strength - 1.0) ranges from -1.0 to +1.0.
-            # Multiplying by 255.0 means adjustment can range from -255 to +255.
-            MAX_ADJUSTMENT_FACTOR = 255.0 
-            for i in range(3):  # Iterate R, G, B channels
-                adjustment = (strengths[i] - 1.0) * MAX_ADJUSTMENT_FACTOR
-                rgb_channels_np_float[:, :, i] += adjustment
-        
-        elif mode.lower() == "multiplicative":
-            for i in range(3):  # Iterate R, G, B channels
-                rgb_channels_np_float[:, :, i] *= strengths[i]
-        
-        else:
-            raise ValueError(f"Unsupported adjustment mode: {mode}. Choose 'additive' or 'multiplicative'.")
+        # Only carry an alpha channel when the image has transparency to preserve
+        target_mode = 'RGBA' if has_alpha(image) else 'RGB'
+        if image.mode != target_mode:
+            image = image.convert(target_mode)
             
-        # Clip values to the valid 0-255 range and convert back to uint8
-        adjusted_rgb_channels = np.clip(rgb_channels_np_float, 0, 255).astype(np.uint8)
+        image_np = adjust_array_rgb(np.asarray(image), r_strength, g_strength, b_strength, mode)
             
-        # Recombine with alpha channel. Create a new array for the result.
-        result_np = np.zeros_like(image_np) # Use np.zeros_like to match shape and dtype
-        result_np[:, :, :3] = adjusted_rgb_channels
-        result_np[:, :, 3] = alpha_channel_np
-            
-        return Image.fromarray(result_np, 'RGBA')
+        return Image.fromarray(image_np, target_mode)
 
     except Exception as e:
         # import traceback # Uncomment for detailed debugging
         # traceback.print_exc() # Uncomment for detailed debugging
         raise Exception(f"Failed to adjust image: {str(e)}")
 
+def encode_png(bgr_image, compression_level=PNG_COMPRESSION_LEVEL):
+    """
+    Encode a BGR or BGRA pixel array as PNG data using OpenCV.
+    
+    Args:
+        bgr_image (np.ndarray): The (H, W, 3) or (H, W, 4) uint8 pixels in BGR(A) order,
+            as OpenCV expects.
+        compression_level (int): The zlib compression level (0 to 9).
+    Returns:
+        np.ndarray: The encoded PNG file contents as a 1-D uint8 array.
+    Raises:
+        Exception: If the image cannot be encoded.
+    """
+    # Encoding in memory also sidesteps cv2.imwrite, which cannot open non-ASCII paths on
+    # Windows; callers write the result with ndarray.tofile
+    success, encoded = cv2.imencode(".png", bgr_image, [cv2.IMWRITE_PNG_COMPRESSION, compression_level])
+    if not success:
+        raise Exception("Failed to encode image as PNG")
+    return encoded
+
+def shift_hue(hue_plane, hue, out=None):
+    """
+    Rotate an OpenCV hue plane (0 to 179) by a fixed amount.
+    
+    Args:
+        hue_plane (np.ndarray): The contiguous (H, W) uint8 hue plane. It is not modified.
+        hue (float): The hue shift in OpenCV units (0 to 180).
+        out (np.ndarray, optional): A (H, W) uint8 buffer for the result.
+    Returns:
+        np.ndarray: The shifted (H, W) uint8 hue plane.
+    """
+    # Hue rotation is pointwise on a uint8 plane, so it is a 256-entry table
+    hue_lut = ((np.arange(256) + int(hue)) % 180).astype(np.uint8)
+    return cv2.LUT(hue_plane, hue_lut, dst=out)
+
+def scale_saturation(hsv_planes, saturation, out=None, sat_out=None, code=cv2.COLOR_HSV2RGB):
+    """
+    Scale the saturation of an HSV image given as planes and convert it back to RGB.
+    
+    Args:
+        hsv_planes (tuple): The contiguous (H, W) uint8 H, S and V planes, as returned
+            by cv2.split (the H plane may already be shifted). They are not modified.
+        saturation (float): The saturation scale factor (0.0 to 1.0).
+        out (np.ndarray, optional): A contiguous (H, W, 3) uint8 buffer to work in and
+            return. A new array is allocated when omitted.
+        sat_out (np.ndarray, optional): A (H, W) uint8 scratch buffer for the scaled S plane.
+        code (int): The cv2.cvtColor code for the final conversion, e.g. cv2.COLOR_HSV2BGR
+            to produce pixels ready for OpenCV encoders.
+    Returns:
+        np.ndarray: The (H, W, 3) uint8 RGB pixels (or BGR, per code).
+    """
+    hue_plane, sat_plane, val_plane = hsv_planes
+    
+    # Single-channel LUTs on contiguous planes take OpenCV's SIMD path, which
+    # interleaved multi-channel tables do not, and H and V are reused untouched
+    sat_lut = np.clip(np.rint(np.arange(256) * saturation), 0, 255).astype(np.uint8)
+    sat_out = cv2.LUT(sat_plane, sat_lut, dst=sat_out)
+    hsv_image = cv2.merge([hue_plane, sat_out, val_plane], dst=out)
+    
+    return cv2.cvtColor(hsv_image, code, dst=hsv_image)
+
+@lru_cache(maxsize=4)
+def make_checkerboard(width, height, cell_size=10):
+    """
+    Build a light checkerboard background for transparency previews.
+    Results are cached so repeated previews at the same size reuse the pattern.
+    
+    Args:
+        width (int): The width of the background in pixels.
+        height (int): The height of the background in pixels.
+        cell_size (int): The size of each checkerboard square in pixels.
+    Returns:
+        np.ndarray: A read-only (H, W, 1) uint16 array of gray levels.
+    """
+    yy, xx = np.indices((height, width))
+    light_cells = ((xx // cell_size + yy // cell_size) & 1).astype(bool)
+    background = np.where(light_cells, np.uint16(255), np.uint16(220))[:, :, None]
+    background.flags.writeable = False
+    return background
+
+def composite_on_checkerboard(image_np, cell_size=10):
+    """
+    Composite RGBA pixels over a light checkerboard to visualize transparency.
+    
+    Args:
+        image_np (np.ndarray): The (H, W, 4) uint8 RGBA pixels to composite.
+        cell_size (int): The size of each checkerboard square in pixels.
+    Returns:
+        np.ndarray: The composited (H, W, 3) uint8 RGB pixels.
+    """
+    height, width = image_np.shape[:2]
+    background = make_checkerboard(width, height, cell_size)
+    
+    # Alpha blend the color channels over the background in 16-bit integers
+    alpha = image_np[:, :, 3:4].astype(np.uint16)
+    rgb = image_np[:, :, :3].astype(np.uint16)
+    blended = (rgb * alpha + background * (255 - alpha) + 127) // 255
+    
+    return blended.astype(np.uint8)
+
+def resize_to_fit(image, max_width, max_height):
+    """
+    Downscale (or upscale) an image to fit within the given area, keeping its aspect ratio.
+    
+    Args:
+        image (PIL.Image): The image to resize.
+        max_width (int): The width of the area to fit in.
+        max_height (int): The height of the area to fit in.
+    Returns:
+        np.ndarray: The resized RGB or RGBA pixels as a uint8 array.
+    """
+    img_width, img_height = image.size
+    scale = min(max_width / img_width, max_height / img_height)
+    new_size = (int(img_width * scale), int(img_height * scale))
+    
+    target_mode = 'RGBA' if has_alpha(image) else 'RGB'
+    if image.mode != target_mode:
+        image = image.convert(target_mode)  # Palette and grayscale modes do not resample smoothly
+    # INTER_AREA averages source pixels, which is fast and alias-free when shrinking
+    interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_LINEAR
+    return cv2.resize(np.asarray(image), new_size, interpolation=interpolation)
+
 class ColorVariationApp(ctk.CTk, TkinterDnD.DnDWrapper):
     def __init__(self):
         super().__init__()
@@ -122,9 +304,14 @@ class ColorVariationApp(ctk.CTk, TkinterDnD.DnDWrapper):
         self.geometry("1100x750") # Adjusted height for progress bar
         
         # Initialize variables
+        self._work_buffers = threading.local()  # Per-thread scratch arrays reused across variations
+        self._log_queue = queue.Queue()  # Pending log entries, drained by _flush_logs
         self.image_path = None
         self.original_image = None
         self.adjusted_image = None
+        self._preview_source = None  # original_image pixels downscaled to the preview size
+        self._generation_cache = None  # (image, adjustment params, HSV planes, alpha) from the last generation
+        self._load_id = 0  # Incremented per load request so stale background loads are discarded
         self.r_value = ctk.DoubleVar(value=1.0)
         self.g_value = ctk.DoubleVar(value=1.0)
         self.b_value = ctk.DoubleVar(value=1.0)
@@ -133,17 +320,14 @@ class ColorVariationApp(ctk.CTk, TkinterDnD.DnDWrapper):
         self.output_path_var = ctk.StringVar(value="Default (input directory)")
         self.rgb_adjustment_mode = ctk.StringVar(value="Additive") # Default to Additive
         self.overwrite_var = ctk.BooleanVar(value=False)  # Default: don't overwrite (append numbers)
+        self._preview_job = None  # Pending after() id for a debounced preview refresh
+        self._last_preview = None  # (preview source, adjustment params) currently shown in the preview
         
         # Format variables for display
         self.r_display = ctk.StringVar(value="1.0")
         self.g_display = ctk.StringVar(value="1.0")
         self.b_display = ctk.StringVar(value="1.0")
         
-        # Register callbacks to update display values
-        self.r_value.trace_add("write", self.update_display_values)
-        self.g_value.trace_add("write", self.update_display_values)
-        self.b_value.trace_add("write", self.update_display_values)
-        
         # Create the UI
         self.create_ui()
         
@@ -151,9 +335,17 @@ class ColorVariationApp(ctk.CTk, TkinterDnD.DnDWrapper):
         self.drop_target_register(DND_FILES)
         self.dnd_bind('<<Drop>>', self.handle_drop)
         
+        # Log messages are queued and written to the widget periodically
+        self._flush_logs()
+        
         # Initial log message
         self.log("アプリケーションが起動しました。画像をドラッグするか「Open Image」ボタンを使用してください。")
         
+    def _on_slider(self, channel, value):
+        """Update the moved slider's display value and schedule a preview refresh"""
+        getattr(self, f"{channel}_display").set(f"{value:.1f}")
+        self.update_preview()
+
     def update_display_values(self, *args):
         """Update the formatted display values for RGB sliders"""
         self.r_display.set(f"{self.r_value.get():.1f}")
@@ -189,6 +381,8 @@ class ColorVariationApp(ctk.CTk, TkinterDnD.DnDWrapper):
         
         self.preview_label = ctk.CTkLabel(self.preview_frame, text="ここに画像をドロップ", font=DEFAULT_FONT)
         self.preview_label.pack(fill="both", expand=True)
+        # Refit the preview when the window is resized; update_preview coalesces the burst of events
+        self.preview_frame.bind("<Configure>", self.update_preview)
         
         # RGB sliders section
         self.control_frame = ctk.CTkFrame(self.right_frame)
@@ -219,8 +413,8 @@ class ColorVariationApp(ctk.CTk, TkinterDnD.DnDWrapper):
         self.r_label = ctk.CTkLabel(self.r_frame, text="R:", width=15, font=DEFAULT_FONT) # Adjusted width
         self.r_label.pack(side="left", padx=(5,2))
         
-        self.r_slider = ctk.CTkSlider(self.r_frame, from_=0.0, to=2.0, variable=self.r_value, 
-                                     command=self.update_preview)
+        self.r_slider = ctk.CTkSlider(self.r_frame, from_=0.0, to=2.0, number_of_steps=RGB_SLIDER_STEPS, variable=self.r_value, 
+                                     command=lambda value: self._on_slider('r', value))
         self.r_slider.pack(side="left", fill="x", expand=True, padx=2)
         
         # display the value of the r_value. this is no entry, just a label
@@ -235,8 +429,8 @@ class ColorVariationApp(ctk.CTk, TkinterDnD.DnDWrapper):
         self.g_label = ctk.CTkLabel(self.g_frame, text="G:", width=15, font=DEFAULT_FONT) # Adjusted width
         self.g_label.pack(side="left", padx=(5,2))
         
-        self.g_slider = ctk.CTkSlider(self.g_frame, from_=0.0, to=2.0, variable=self.g_value,
-                                     command=self.update_preview)
+        self.g_slider = ctk.CTkSlider(self.g_frame, from_=0.0, to=2.0, number_of_steps=RGB_SLIDER_STEPS, variable=self.g_value,
+                                     command=lambda value: self._on_slider('g', value))
         self.g_slider.pack(side="left", fill="x", expand=True, padx=2)
 
         # display the value of the g_value. this is no entry, just a label
@@ -251,8 +445,8 @@ class ColorVariationApp(ctk.CTk, TkinterDnD.DnDWrapper):
         self.b_label = ctk.CTkLabel(self.b_frame, text="B:", width=15, font=DEFAULT_FONT) # Adjusted width
         self.b_label.pack(side="left", padx=(5,2))
         
-        self.b_slider = ctk.CTkSlider(self.b_frame, from_=0.0, to=2.0, variable=self.b_value,
-                                     command=self.update_preview)
+        self.b_slider = ctk.CTkSlider(self.b_frame, from_=0.0, to=2.0, number_of_steps=RGB_SLIDER_STEPS, variable=self.b_value,
+                                     command=lambda value: self._on_slider('b', value))
         self.b_slider.pack(side="left", fill="x", expand=True, padx=2)
 
         # display the value of the b_value. this is no entry, just a label
@@ -395,24 +589,63 @@ class ColorVariationApp(ctk.CTk, TkinterDnD.DnDWrapper):
             self.load_image_file(file_path)
     
     def load_image_file(self, file_path):
-        """Load an image from the given path and update the preview"""
+        """Start loading an image from the given path in a background thread"""
+        self.log(f"画像を読み込み中: {file_path}")
+        self._load_id += 1
+        
+        # Keep the previous preview until the new one is ready, but show the loading state
+        self.preview_label.configure(text="読み込み中...")
+        
+        # Widget sizes must be read on the UI thread
+        preview_width = self.preview_frame.winfo_width() - 20
+        preview_height = self.preview_frame.winfo_height() - 20
+        
+        threading.Thread(
+            target=self._load_image_worker,
+            args=(self._load_id, file_path, preview_width, preview_height),
+            daemon=True
+        ).start()
+    
+    def _load_image_worker(self, load_id, file_path, preview_width, preview_height):
+        """Decode the image and build its preview source off the UI thread"""
         try:
-            self.log(f"画像を読み込み中: {file_path}")
-            self.image_path = file_path
-            self.original_image = load_image(file_path)
-            
-            # Update default output path
-            self.update_default_output_path()
-            
-            # Update the image preview
-            self.update_preview()
-            
-            # Enable the generate button
-            self.generate_button.configure(state="normal")
-            
-            self.log(f"画像の読み込みに成功しました: {os.path.basename(file_path)}")
+            image = load_image(file_path)
+            # Image.open is lazy; decode here so the UI and generation threads never trigger it
+            image.load()
+            preview_source = None
+            if preview_width > 100 and preview_height > 100:
+                preview_source = resize_to_fit(image, preview_width, preview_height)
+            self.after(0, lambda: self._finish_image_load(load_id, file_path, image, preview_source))
         except Exception as e:
             self.log(f"画像読み込みエラー: {str(e)}")
+            self.after(0, lambda: self._cancel_image_load(load_id))
+    
+    def _cancel_image_load(self, load_id):
+        """Clear the loading message after a failed load"""
+        if load_id == self._load_id:
+            self.preview_label.configure(text="" if self.original_image else "ここに画像をドロップ")
+    
+    def _finish_image_load(self, load_id, file_path, image, preview_source):
+        """Install a loaded image on the UI thread and update the preview"""
+        if load_id != self._load_id:
+            return  # A newer image was requested while this one was loading
+        
+        self.image_path = file_path
+        self.original_image = image
+        self._preview_source = preview_source
+        self._generation_cache = None
+        self.preview_label.configure(text="")
+        
+        # Update default output path
+        self.update_default_output_path()
+        
+        # Update the image preview
+        self.update_preview()
+        
+        # Enable the generate button
+        self.generate_button.configure(state="normal")
+        
+        self.log(f"画像の読み込みに成功しました: {os.path.basename(file_path)}")
     
     def update_default_output_path(self):
         """Set default output path based on input image"""
@@ -423,62 +656,68 @@ class ColorVariationApp(ctk.CTk, TkinterDnD.DnDWrapper):
             self.output_path_var.set(default_output)
     
     def update_preview(self, *args):
+        """Schedule a preview refresh, coalescing bursts of slider events into one render"""
+        if self._preview_job is not None:
+            self.after_cancel(self._preview_job)
+        self._preview_job = self.after(PREVIEW_DEBOUNCE_MS, self._render_preview)
+
+    def _get_adjustment_params(self):
+        """Return the current RGB adjustment settings as keyword arguments for adjust_image_rgb"""
+        return {
+            'r_strength': self.r_value.get(),
+            'g_strength': self.g_value.get(),
+            'b_strength': self.b_value.get(),
+            'mode': self.rgb_adjustment_mode.get(),
+        }
+
+    def _get_preview_source(self, preview_width, preview_height):
+        """Return original_image pixels downscaled to fit the preview area, rebuilding them only when the size changes"""
+        img_width, img_height = self.original_image.size
+        scale = min(preview_width / img_width, preview_height / img_height)
+        
+        new_size = (int(img_width * scale), int(img_height * scale))
+        if self._preview_source is None or self._preview_source.shape[1::-1] != new_size:
+            # Kept as a NumPy array so each render stays in NumPy until the final PhotoImage
+            self._preview_source = resize_to_fit(self.original_image, preview_width, preview_height)
+        return self._preview_source
+
+    def _render_preview(self):
         """Update the image preview with current RGB adjustments, handling transparency"""
+        self._preview_job = None
         if not self.original_image:
             return
         
         try:
-            # Apply RGB adjustments
-            self.adjusted_image = adjust_image_rgb(
-                self.original_image,
-                r_strength=self.r_value.get(),
-                g_strength=self.g_value.get(),
-                b_strength=self.b_value.get(),
-                mode=self.rgb_adjustment_mode.get() # Pass selected mode
-            )
-            
             # Resize the image for preview (maintaining aspect ratio)
             preview_width = self.preview_frame.winfo_width() - 20
             preview_height = self.preview_frame.winfo_height() - 20
             
             if preview_width > 100 and preview_height > 100:
-                img_width, img_height = self.adjusted_image.size
+                # Apply RGB adjustments to the downscaled copy only; generation uses full resolution
+                preview_source = self._get_preview_source(preview_width, preview_height)
+                adjustment_params = self._get_adjustment_params()
                 
-                # Calculate scaling factor
-                scale_w = preview_width / img_width
-                scale_h = preview_height / img_height
-                scale = min(scale_w, scale_h)
+                # Frame <Configure> events and unchanged slider values would redraw the same image
+                last = self._last_preview
+                if last is not None and last[0] is preview_source and last[1] == adjustment_params:
+                    return
                 
-                new_width = int(img_width * scale)
-                new_height = int(img_height * scale)
-                
-                # Resize and display
-                display_img = self.adjusted_image.resize((new_width, new_height), Image.LANCZOS)
+                display_np = adjust_array_rgb(preview_source, **adjustment_params)
                 
                 # For transparent images, create a checkerboard background
-                if display_img.mode == 'RGBA':
-                    # Create a checkerboard pattern for transparency visualization
-                    checkerboard = Image.new('RGB', display_img.size, (255, 255, 255))
-                    
-                    # Create checkerboard pattern
-                    cell_size = 10  # Size of each checkerboard square
-                    for y in range(0, display_img.height, cell_size):
-                        for x in range(0, display_img.width, cell_size):
-                            if (x // cell_size + y // cell_size) % 2 == 0:
-                                box = (x, y, min(x + cell_size, display_img.width), 
-                                      min(y + cell_size, display_img.height))
-                                ImageDraw.Draw(checkerboard).rectangle(box, fill=(220, 220, 220))
-                    
-                    # より明示的な合成方法を使用
-                    r, g, b, a = display_img.split()
-                    # チェッカーボード上に色情報を貼り付け、アルファチャンネルをマスクとして使用
-                    checkerboard.paste(Image.merge('RGB', (r, g, b)), (0, 0), a)
-                    display_img = checkerboard
-                
-                photo = ImageTk.PhotoImage(display_img)
+                if display_np.shape[2] == 4:
+                    display_np = composite_on_checkerboard(display_np)
                 
-                self.preview_label.configure(image=photo, text="")
-                self.preview_label.image = photo  # Keep a reference
+                display_image = Image.fromarray(display_np)
+                photo = getattr(self.preview_label, 'image', None)
+                if photo is not None and (photo.width(), photo.height()) == display_image.size:
+                    # Same size as the shown image, so update the Tk photo in place
+                    photo.paste(display_image)
+                else:
+                    photo = ImageTk.PhotoImage(display_image)
+                    self.preview_label.configure(image=photo, text="")
+                    self.preview_label.image = photo  # Keep a reference
+                self._last_preview = (preview_source, adjustment_params)
         except Exception as e:
             self.log(f"プレビュー更新エラー: {str(e)}")
     
@@ -497,8 +736,15 @@ class ColorVariationApp(ctk.CTk, TkinterDnD.DnDWrapper):
             output_path = self._prepare_output_path()
             hue_count = self.hue_var_count.get()
             sat_count = self.sat_var_count.get()
+            adjustment_params = self._get_adjustment_params()
+            overwrite = self.overwrite_var.get()  # Tk variables must be read on the UI thread
+            # A new image can finish loading mid-run, so the thread works on this snapshot
+            image = self.original_image
+            image_path = self.image_path
             
-            self._start_generation_thread(output_path, hue_count, sat_count)
+            self._start_generation_thread(
+                image, image_path, output_path, hue_count, sat_count, adjustment_params, overwrite
+            )
             
         except Exception as e:
             self.log(f"エラー: {str(e)}")
@@ -506,7 +752,7 @@ class ColorVariationApp(ctk.CTk, TkinterDnD.DnDWrapper):
 
     def _validate_image(self):
         """Validate that image is loaded"""
-        if not self.adjusted_image:
+        if not self.original_image:
             self.log("エラー: 画像が読み込まれていません")
             return False
         return True
@@ -519,132 +765,179 @@ class ColorVariationApp(ctk.CTk, TkinterDnD.DnDWrapper):
             output_path = self.output_path_var.get()
         return output_path
 
-    def _start_generation_thread(self, output_path, hue_count, sat_count):
+    def _start_generation_thread(self, image, image_path, output_path, hue_count, sat_count, adjustment_params, overwrite):
         """Start the generation process in a separate thread"""
         thread = threading.Thread(
             target=self._generate_variations_thread, 
-            args=(output_path, hue_count, sat_count)
+            args=(image, image_path, output_path, hue_count, sat_count, adjustment_params, overwrite)
         )
         thread.daemon = True
         thread.start()
         self.log(f"バリエーション生成を開始しました: {output_path}")
 
-    def _generate_variations_thread(self, output_path, hue_count, sat_count):
+    def _generate_variations_thread(self, image, image_path, output_path, hue_count, sat_count, adjustment_params, overwrite):
         """Thread function to generate variations without freezing UI"""
         try:
-            output_path = self._setup_output_directories(output_path)
+            output_path = self._setup_output_directories(output_path, overwrite)
             combined_dir = output_path
             
-            variations = self._generate_combined_variations(hue_count, sat_count)
-            self._save_variations(variations, combined_dir, output_path)
+            hsv_planes, alpha_channel = self._get_generation_source(image, adjustment_params)
+            
+            variation_count = self._generate_combined_variations(
+                image_path, hue_count, sat_count, combined_dir, hsv_planes, alpha_channel
+            )
+            self._log_save_success(variation_count, combined_dir, output_path)
             
         except Exception as e:
             self._handle_generation_error(e)
         finally:
             self._cleanup_progress_bar()
 
-    def _setup_output_directories(self, output_path):
+    def _setup_output_directories(self, output_path, overwrite):
         """Setup output directories and return final output path"""
-        if not self.overwrite_var.get():
+        if not overwrite:
             output_path = get_unique_folder_path(output_path)
             
         os.makedirs(output_path, exist_ok=True)
         
         return output_path
 
-    def _generate_combined_variations(self, hue_count, sat_count):
-        """Generate all hue/saturation combinations"""
+    def _get_generation_source(self, image, adjustment_params):
+        """Return the (HSV planes, alpha channel) of the adjusted full-resolution image, reusing the last run's when nothing changed"""
+        # Only locals are used here: the UI thread may load another image or start
+        # another generation while this one runs
+        cache = self._generation_cache
+        if cache is not None and cache[0] is image and cache[1] == adjustment_params:
+            return cache[2], cache[3]
+        
+        # The preview only adjusts a downscaled copy, so adjust the full-resolution image here
+        adjusted = adjust_image_rgb(image, **adjustment_params)
+        
+        # Read-only view is enough here; np.array would copy the pixels a second time
+        image_np = np.asarray(adjusted)
+        alpha_channel = image_np[:, :, 3] if adjusted.mode == 'RGBA' else None
+        
+        # The source HSV is the same for every variation, so convert it only once
+        # and keep it as separate contiguous H, S and V planes
+        hsv_planes = tuple(cv2.split(cv2.cvtColor(image_np[:, :, :3], cv2.COLOR_RGB2HSV)))
+        
+        self._generation_cache = (image, adjustment_params, hsv_planes, alpha_channel)
+        return hsv_planes, alpha_channel
+
+    def _generate_combined_variations(self, image_path, hue_count, sat_count, combined_dir, hsv_planes, alpha_channel):
+        """Generate all hue/saturation combinations and save each one as it is built"""
         self.log(f"組み合わせバリエーションを生成中 (合計 {hue_count * sat_count})...")
-        self.progress_bar.configure(mode="determinate")
-        
-        variations = []
-        total_variations = hue_count * sat_count
-        generated_count = 0
-        
-        has_alpha = self.adjusted_image.mode == 'RGBA'
-        image_np = np.array(self.adjusted_image)
+        self.after(0, lambda: self.progress_bar.configure(mode="determinate"))
 
-        for h_idx in range(hue_count):
-            hue = h_idx * (180 / hue_count)
-            hue_display = hue * 2
-            hue_label = f"{int(hue_display)}°"
-            
-            for s_idx in range(sat_count):
-                saturation = (s_idx + 1) * (1 / sat_count)
-                sat_label = f"{int(saturation * 100)}%"
-                
-                variation = self._create_single_variation(
-                    image_np, hue, saturation, hue_label, sat_label, has_alpha
-                )
-                variations.append(variation)
-                
-                generated_count += 1
-                progress = generated_count / (total_variations * 2)
-                self.after(0, lambda p=progress: self.progress_bar.set(p))
-        
-        return variations
+        hues = [h_idx * (180 / hue_count) for h_idx in range(hue_count)]
+        saturations = [(s_idx + 1) * (1 / sat_count) for s_idx in range(sat_count)]
 
-    def _create_single_variation(self, image_np, hue, saturation, hue_label, sat_label, has_alpha):
-        """Create a single hue/saturation variation"""
-        if has_alpha:
-            return self._create_alpha_variation(image_np, hue, saturation, hue_label, sat_label)
-        else:
-            return self._create_rgb_variation(image_np, hue, saturation, hue_label, sat_label)
-
-    def _create_alpha_variation(self, image_np, hue, saturation, hue_label, sat_label):
-        """Create variation for RGBA image"""
-        rgb_channels = image_np[:, :, :3]
-        alpha_channel = image_np[:, :, 3]
-        hsv_image = cv2.cvtColor(rgb_channels, cv2.COLOR_RGB2HSV)
-        hsv_image[:, :, 0] = (hsv_image[:, :, 0] + hue) % 180
-        hsv_image[:, :, 1] = hsv_image[:, :, 1] * saturation
-        rgb_result = cv2.cvtColor(hsv_image, cv2.COLOR_HSV2RGB)
-        
-        result = np.zeros((image_np.shape[0], image_np.shape[1], 4), dtype=np.uint8)
-        result[:, :, :3] = rgb_result
-        result[:, :, 3] = alpha_channel
-        
-        return {
-            'image': Image.fromarray(result, 'RGBA'),
-            'hue': hue_label,
-            'saturation': sat_label
-        }
+        original_filename = os.path.splitext(os.path.basename(image_path))[0]
 
-    def _create_rgb_variation(self, image_np, hue, saturation, hue_label, sat_label):
-        """Create variation for RGB image"""
-        hsv_image = cv2.cvtColor(image_np, cv2.COLOR_RGB2HSV)
-        hsv_image[:, :, 0] = (hsv_image[:, :, 0] + hue) % 180
-        hsv_image[:, :, 1] = hsv_image[:, :, 1] * saturation
-        color_variation = cv2.cvtColor(hsv_image, cv2.COLOR_HSV2RGB)
-        
-        return {
-            'image': Image.fromarray(color_variation),
-            'hue': hue_label,
-            'saturation': sat_label
-        }
+        # The shifted hue plane does not depend on saturation, so the first variation
+        # of each hue builds it and the others share it read-only. The plane is
+        # released once every saturation level of that hue is done, which keeps
+        # only a few alive since tasks are submitted hue by hue.
+        hue_locks = [threading.Lock() for _ in hues]
+        hue_planes = {}  # h_idx -> [shifted hue plane, variations still to use it]
 
-    def _save_variations(self, variations, combined_dir, output_path):
-        """Save all variations to disk"""
-        self.log("バリエーションデータの生成完了。保存を開始します...")
-        
-        original_filename = os.path.splitext(os.path.basename(self.image_path))[0]
-        
-        # Save variations
-        for i, var in enumerate(variations):
-            filename = f"{original_filename}_{i:03d}.png"
+        def get_hue_plane(h_idx):
+            with hue_locks[h_idx]:
+                entry = hue_planes.get(h_idx)
+                if entry is None:
+                    entry = hue_planes[h_idx] = [shift_hue(hsv_planes[0], hues[h_idx]), sat_count]
+                return entry[0]
+
+        def release_hue_plane(h_idx):
+            with hue_locks[h_idx]:
+                hue_planes[h_idx][1] -= 1
+                if hue_planes[h_idx][1] == 0:
+                    del hue_planes[h_idx]
+
+        def create_and_encode(h_idx, s_idx):
+            index = h_idx * sat_count + s_idx
+            filename = f"{original_filename}_{index:03d}.png"
             filename = filename.replace("°", "deg").replace("%", "pct")
             filepath = os.path.join(combined_dir, filename)
             
-            if var['image'].mode == 'RGBA':
-                var['image'].save(filepath, format="PNG")
-            else:
-                var['image'].save(filepath)
+            shifted_planes = (get_hue_plane(h_idx), hsv_planes[1], hsv_planes[2])
+            # Each variation is encoded as soon as it is built, so the per-thread
+            # buffers can be reused for the next one
+            encoded = encode_png(self._create_variation(shifted_planes, alpha_channel, saturations[s_idx]))
+            release_hue_plane(h_idx)
+            write_queue.put((filepath, encoded))
+
+        # Encoding is CPU-bound and parallel, but disk writes go through one writer thread
+        # so the files are written sequentially instead of competing for the device.
+        # The queue is bounded so encoders wait for the disk instead of piling up PNG data.
+        worker_count = min(MAX_GENERATION_WORKERS, os.cpu_count() or 1)
+        write_queue = queue.Queue(maxsize=2 * worker_count)
+        write_errors = []
+        writer = threading.Thread(target=self._write_encoded_files, args=(write_queue, write_errors), daemon=True)
+        writer.start()
 
-            # progress update
-            progress = (i + 1) / (len(variations) * 2) + 0.5
-            self.after(0, lambda p=progress: self.progress_bar.set(p))
+        # OpenCV releases the GIL during color conversion and PNG deflate, so several
+        # variations are built and encoded at once. Only one image per worker is alive.
+        total_variations = hue_count * sat_count
+        try:
+            with ThreadPoolExecutor(max_workers=worker_count) as executor:
+                futures = [
+                    executor.submit(create_and_encode, h_idx, s_idx)
+                    for h_idx in range(hue_count)
+                    for s_idx in range(sat_count)
+                ]
+                for done_count, future in enumerate(as_completed(futures), start=1):
+                    future.result()  # Re-raise any error in this thread
+
+                    # progress update
+                    progress = done_count / total_variations
+                    self.after(0, lambda p=progress: self.progress_bar.set(p))
+        finally:
+            write_queue.put(None)  # Tell the writer no more files are coming
+            writer.join()
+        
+        if write_errors:
+            raise write_errors[0]
+        
+        return total_variations
+
+    def _write_encoded_files(self, write_queue, write_errors):
+        """Writer thread: write queued (path, encoded data) pairs to disk until a None sentinel arrives"""
+        while True:
+            item = write_queue.get()
+            if item is None:
+                break
+            filepath, encoded = item
+            try:
+                encoded.tofile(filepath)
+            except Exception as e:
+                write_errors.append(e)
+
+    def _create_variation(self, hsv_planes, alpha_channel, saturation):
+        """Build one saturation variation of hue-shifted planes in BGR(A) order in this thread's reusable buffers"""
+        height, width = hsv_planes[0].shape
+        bgr_result = scale_saturation(
+            hsv_planes, saturation,
+            out=self._get_work_buffer('hsv', (height, width, 3)),
+            sat_out=self._get_work_buffer('sat', (height, width)),
+            code=cv2.COLOR_HSV2BGR  # Convert straight to the channel order the PNG encoder wants
+        )
+        if alpha_channel is None:
+            return bgr_result
         
-        self._log_save_success(len(variations), combined_dir, output_path)
+        # Every channel is overwritten, so the buffer never needs clearing
+        result = self._get_work_buffer('bgra', (height, width, 4))
+        result[:, :, :3] = bgr_result
+        result[:, :, 3] = alpha_channel
+        return result
+
+    def _get_work_buffer(self, name, shape):
+        """Return this thread's named uint8 scratch buffer of the given shape, allocating it on first use"""
+        buffer = getattr(self._work_buffers, name, None)
+        if buffer is None or buffer.shape != shape:
+            buffer = np.empty(shape, dtype=np.uint8)
+            setattr(self._work_buffers, name, buffer)
+        return buffer
 
     def _save_adjusted_original(self, output_path, original_filename):
         """Save the adjusted original image"""
@@ -656,7 +949,7 @@ class ColorVariationApp(ctk.CTk, TkinterDnD.DnDWrapper):
 
     def _log_save_success(self, variation_count, combined_dir, output_path):
         """Log successful save operation"""
-        self.progress_bar.set(1.0)
+        self.after(0, lambda: self.progress_bar.set(1.0))
         self.log(f"バリエーションの保存に成功しました:")
         self.log(f"- {variation_count}個の組み合わせバリエーション: {combined_dir}")
         self.log(f"- 調整済み元画像: {output_path}")
@@ -665,27 +958,40 @@ class ColorVariationApp(ctk.CTk, TkinterDnD.DnDWrapper):
         """Handle errors during generation"""
         self.log(f"バリエーション生成エラー: {str(error)}")
         traceback.print_exc()
-        self.progress_bar.set(0)
+        self.after(0, lambda: self.progress_bar.set(0))
 
     def _cleanup_progress_bar(self):
         """Clean up progress bar after generation"""
-        self.progress_bar.stop()
+        self.after(0, self.progress_bar.stop)
         self.after(2000, lambda: self.progress_bar.set(0))
 
     def log(self, message):
-        """Add a message to the log with timestamp"""
+        """Queue a message with timestamp for the log; safe to call from worker threads"""
         timestamp = datetime.now().strftime("%H:%M:%S")
         log_entry = f"[{timestamp}] {message}\n"
-        
-        # Enable text widget for editing
-        self.log_text.configure(state="normal")
-        self.log_text.insert("end", log_entry)
-        self.log_text.see("end")  # Scroll to end
-        self.log_text.configure(state="disabled")
+        self._log_queue.put(log_entry)
         
         # Also print to console
         print(log_entry.strip())
 
+    def _flush_logs(self):
+        """Append all queued log messages to the log widget in one edit, then reschedule"""
+        entries = []
+        while True:
+            try:
+                entries.append(self._log_queue.get_nowait())
+            except queue.Empty:
+                break
+        
+        if entries:
+            # Enable text widget for editing
+            self.log_text.configure(state="normal")
+            self.log_text.insert("end", "".join(entries))
+            self.log_text.see("end")  # Scroll to end
+            self.log_text.configure(state="disabled")
+        
+        self.after(LOG_FLUSH_INTERVAL_MS, self._flush_logs)
+
 def get_unique_folder_path(base_path):
     """
     Create a unique folder path by appending incrementing numbers if needed.
@@ -695,15 +1001,32 @@ def get_unique_folder_path(base_path):
     Returns:
         str: A unique folder path (either the original or with a number appended)
     """
-    if not os.path.exists(base_path):
+    # Trailing separators would leave an empty folder name that never matches a listing
+    normalized_path = os.path.normpath(base_path)
+    parent_dir, base_name = os.path.split(normalized_path)
+    
+    existing = None
+    if base_name not in ('', os.curdir, os.pardir):
+        base_path = normalized_path
+        try:
+            # List the parent once instead of probing every candidate with a stat call
+            existing = {os.path.normcase(entry.name) for entry in os.scandir(parent_dir or os.curdir)}
+        except OSError:
+            pass  # Missing, unreadable or not a directory: probe each candidate instead
+    
+    def exists(path):
+        if existing is not None and os.path.normcase(os.path.basename(path)) in existing:
+            return True
+        # normcase does not fold case everywhere (e.g. macOS), so confirm a miss on disk
+        return os.path.exists(path)
+    
+    if not exists(base_path):
         return base_path
     else:
         counter = 1
-        while True:
-            new_path = f"{base_path}_{counter}"
-            if not os.path.exists(new_path):
-                return new_path
+        while exists(f"{base_path}_{counter}"):
             counter += 1
+        return f"{base_path}_{counter}"
 
 # Main application entry point
 if __name__ == "__main__":